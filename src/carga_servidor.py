@@ -0,0 +1,123 @@
+# --- 1. BIBLIOTECAS ---
+import asyncio
+import argparse
+import json
+import math
+import random
+import time
+import numpy as np
+
+# ==============================================================================
+# TESTE DE CARGA DO SERVIDOR DE OTIMIZAÇÃO
+# Simula assessores arrastando os sliders MIN/MAX: cada cliente mantém uma
+# conexão keep-alive e dispara requisições em sequência. Mede vazão
+# (req/s) e latência (p50/p95/p99) contra o 'servidor_otimizacao.py' local.
+# ==============================================================================
+HOST = '127.0.0.1'
+PORTA = 8765
+CLIENTES = 20
+REQUISICOES_POR_CLIENTE = 50
+PASSO_SLIDER = 0.01     # Sliders andam de 1% em 1% (gera repetição -> cache)
+# ==============================================================================
+
+
+async def abrir_conexao(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.porta)
+
+
+async def enviar(reader, writer, metodo, rota, corpo=None):
+    dados = json.dumps(corpo).encode('utf-8') if corpo is not None else b''
+    writer.write(
+        f"{metodo} {rota} HTTP/1.1\r\nHost: local\r\nContent-Length: {len(dados)}\r\n\r\n".encode('latin-1')
+        + dados
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    tamanho = 0
+    while True:
+        h = await reader.readline()
+        if h in (b'\r\n', b''):
+            break
+        k, _, v = h.decode('latin-1').partition(':')
+        if k.strip().lower() == 'content-length':
+            tamanho = int(v)
+    return status, json.loads(await reader.readexactly(tamanho))
+
+
+def sortear_restricoes(n_ativos):
+    # Sempre viável: Min <= 1/N <= Max, em passos de PASSO_SLIDER
+    passos_min = math.floor(1 / n_ativos / PASSO_SLIDER)
+    passos_max = math.ceil(1 / n_ativos / PASSO_SLIDER)
+    minimo = random.randint(0, passos_min) * PASSO_SLIDER
+    maximo = random.randint(passos_max, round(1 / PASSO_SLIDER)) * PASSO_SLIDER
+    return round(minimo, 4), round(maximo, 4)
+
+
+async def cliente(args, n_ativos, latencias, erros):
+    reader, writer = await abrir_conexao(args)
+    try:
+        for _ in range(args.requisicoes):
+            minimo, maximo = sortear_restricoes(n_ativos)
+            t0 = time.perf_counter()
+            status, _ = await enviar(reader, writer, 'POST', '/otimizar',
+                                     {'universo': args.universo, 'min': minimo, 'max': maximo})
+            latencias.append(time.perf_counter() - t0)
+            if status != 200:
+                erros.append(status)
+    finally:
+        writer.close()
+
+
+async def main(args):
+    print(f"--- Teste de Carga: {args.clientes} clientes x {args.requisicoes} requisições ---")
+
+    # Aquece o universo (carregamento do painel e cálculo de mu/S fora da medição)
+    reader, writer = await abrir_conexao(args)
+    status, r = await enviar(reader, writer, 'POST', '/otimizar',
+                             {'universo': args.universo, 'min': 0, 'max': 1})
+    if status != 200:
+        print(f"Erro no aquecimento: {r}")
+        return
+    n_ativos = r['n_ativos']
+    _, saude_antes = await enviar(reader, writer, 'GET', '/saude')
+
+    latencias, erros = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*[cliente(args, n_ativos, latencias, erros) for _ in range(args.clientes)])
+    duracao = time.perf_counter() - t0
+
+    _, saude = await enviar(reader, writer, 'GET', '/saude')
+    writer.close()
+
+    lat_ms = np.array(latencias) * 1000
+    total = len(latencias)
+    print("-" * 60)
+    print(f"{'Requisições':<25} {total}")
+    print(f"{'Erros':<25} {len(erros)}")
+    print(f"{'Duração':<25} {duracao:.2f} s")
+    print(f"{'Vazão':<25} {total / duracao:,.1f} req/s")
+    print(f"{'Latência média':<25} {lat_ms.mean():.1f} ms")
+    for p in (50, 95, 99):
+        print(f"{f'Latência p{p}':<25} {np.percentile(lat_ms, p):.1f} ms")
+    print(f"{'Latência máxima':<25} {lat_ms.max():.1f} ms")
+    print("-" * 60)
+    lotes = saude['lotes'] - saude_antes['lotes']
+    solves = saude['solves'] - saude_antes['solves']
+    hits = saude['acertos_cache'] - saude_antes['acertos_cache']
+    print(f"{'Acertos de cache':<25} {hits} ({hits / max(total, 1):.0%})")
+    print(f"{'Lotes / solves':<25} {lotes} / {solves}")
+    print("-" * 60)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor de otimização.")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--porta', type=int, default=PORTA)
+    parser.add_argument('--unix', help="Caminho de socket Unix do servidor")
+    parser.add_argument('--universo', default='assets')
+    parser.add_argument('--clientes', type=int, default=CLIENTES)
+    parser.add_argument('--requisicoes', type=int, default=REQUISICOES_POR_CLIENTE)
+    asyncio.run(main(parser.parse_args()))
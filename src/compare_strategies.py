@@ -5,6 +5,7 @@ import yfinance as yf
 import matplotlib.pyplot as plt
 import os
 from datetime import datetime, timedelta
+from painel_precos import PainelPrecos
 
 # Estilo visual limpo e profissional
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -132,7 +133,11 @@ try:
         dados = dados_raw['Close']
     else:
         dados = dados_raw
-    dados.dropna(inplace=True)
+    # Painel compacto: as estratégias recortam views dele em vez de copiar o DataFrame
+    # (float64 e dropna só nas linhas, como antes: o backtest não perde precisão)
+    painel = PainelPrecos.from_frame(dados, dtype=np.float64).sem_lacunas(remover_tickers_vazios=False)
+    del dados_raw
+    dados = painel.to_frame()
     print(f" > Dados baixados: {dados.shape[0]} dias de pregão.")
 except Exception as e:
     print(f"Erro download: {e}")
@@ -142,27 +147,25 @@ except Exception as e:
 # --- 6. SIMULAÇÃO ---
 print("\n[4/7] Simulando Performance...")
 
-def simular(pesos, df, capital):
-    if not pesos: return pd.Series(0, index=df.index)
+def simular(pesos, painel, capital):
+    if not pesos: return pd.Series(0, index=painel.datas)
     
     # Filtra apenas ativos que conseguimos baixar
-    ativos = {k: v for k, v in pesos.items() if k in df.columns}
+    ativos = {k: v for k, v in pesos.items() if k in painel}
     
     # Renormaliza para 100%
     soma = sum(ativos.values())
-    if soma == 0: return pd.Series(0, index=df.index)
+    if soma == 0: return pd.Series(0, index=painel.datas)
     ativos = {k: v / soma for k, v in ativos.items()}
     
-    # Cálculo
-    ret_acum = df[list(ativos.keys())] / df[list(ativos.keys())].iloc[0]
-    saldo = pd.Series(0.0, index=df.index)
-    for at, pe in ativos.items():
-        saldo += ret_acum[at] * pe * capital
-    return saldo
-
-saldo_manual = simular(cart_manual, dados, CAPITAL)
-saldo_restrita = simular(cart_restrita, dados, CAPITAL)
-saldo_sem_restricao = simular(cart_sem_restricao, dados, CAPITAL)
+    # Cálculo: saldo(t) = sum(preco(t) * peso * capital / preco(0)) -> um único produto matriz-vetor
+    valores = painel.selecionar(list(ativos.keys())).valores
+    coef = np.array(list(ativos.values())) * capital / valores[0].astype(np.float64)
+    return pd.Series(valores @ coef, index=painel.datas)
+
+saldo_manual = simular(cart_manual, painel, CAPITAL)
+saldo_restrita = simular(cart_restrita, painel, CAPITAL)
+saldo_sem_restricao = simular(cart_sem_restricao, painel, CAPITAL)
 saldo_bench = (dados[BENCHMARK_TICKER] / dados[BENCHMARK_TICKER].iloc[0]) * CAPITAL
 
 
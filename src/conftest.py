@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os scripts de src/ importam uns aos outros pelo nome do módulo (ex.: 'from painel_precos import ...')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -7,6 +7,7 @@ libs = [
     "yfinance",
     "matplotlib",
     "PyPortfolioOpt",
+    "cvxpy",         # Problema Max Sharpe parametrizado do servidor de otimização
     "scikit-learn",  # Necessário para o Ledoit-Wolf Shrinkage
     "xlsxwriter",    # Gráficos no Excel
     "openpyxl",      # Leitura de Excel/Config
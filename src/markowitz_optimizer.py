@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from pypfopt import risk_models, expected_returns
 from pypfopt.efficient_frontier import EfficientFrontier 
 from pypfopt import plotting
+from painel_precos import PainelPrecos
 
 # Configuração visual
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -17,6 +18,7 @@ plt.style.use('seaborn-v0_8-darkgrid')
 # ==============================================================================
 MIN_ALOCACAO = 0.05  # X % (Obriga a ter pelo menos X % de cada ativo)
 MAX_ALOCACAO = 0.30  # Y % (Nenhum ativo pode passar de Y % da carteira)
+DTYPE_PRECOS = np.float32  # float32 = metade da memória; use np.float64 se precisar de precisão total
 # ==============================================================================
 
 # --- 2. DIRETÓRIOS E DADOS ---
@@ -57,13 +59,27 @@ try:
         precos = dados['Close']
     else:
         precos = dados
-        
-    precos.dropna(axis=1, how='all', inplace=True)
-    precos.dropna(inplace=True)
+
+    # Painel compacto: converte só o Close para DTYPE_PRECOS e libera o download
+    # (OHLCV completo em float64) antes de qualquer outra cópia
+    painel = PainelPrecos.from_frame(precos, dtype=DTYPE_PRECOS)
+    del dados, precos
+    painel = painel.sem_lacunas()
 except Exception as e:
     print(f"Erro download: {e}")
     exit()
 
+# Painel em disco (memmap) para o servidor de otimização. Falha aqui não
+# interrompe o otimizador: segue com o painel em memória.
+try:
+    arq_painel = painel.salvar(os.path.join(processed_dir, 'painel_assets'))
+    painel = PainelPrecos.carregar(arq_painel)
+    print(f" > {painel} (memmap: {arq_painel})")
+except Exception as e:
+    print(f" [AVISO] Não foi possível salvar o painel de preços: {e}")
+    print(f" > {painel} (em memória)")
+precos = painel.to_frame()
+
 # --- 3. CÁLCULO DE RISCO E RETORNO ---
 print("\n[2/4] Calculando Matrizes (Mu & Sigma)...")
 mu = expected_returns.mean_historical_return(precos, frequency=252)
@@ -0,0 +1,169 @@
+# --- PAINEL DE PREÇOS COMPACTO ---
+# Guarda o histórico de cotações como um único bloco numpy (float32 ou float64)
+# + índice de datas + índice de tickers. Em disco vira um .npy mapeável em memória
+# (np.memmap), então históricos longos (milhares de tickers x décadas) não
+# precisam ser copiados a cada etapa do pipeline.
+#
+# Layout: os valores ficam em ordem Fortran (coluna = ticker contígua). Assim:
+#   - recorte por período (linhas)          -> view, sem cópia
+#   - recorte por faixa/passo de tickers    -> view, sem cópia
+#   - lista arbitrária de tickers           -> cópia apenas das colunas pedidas
+#   - to_frame()                            -> DataFrame sobre o mesmo buffer
+import os
+import numpy as np
+import pandas as pd
+
+
+class PainelPrecos:
+    def __init__(self, valores, datas, tickers):
+        valores = np.asarray(valores)
+        if valores.ndim != 2:
+            raise ValueError("O painel precisa de uma matriz 2D (datas x tickers).")
+        if valores.shape != (len(datas), len(tickers)):
+            raise ValueError(
+                f"Dimensões incompatíveis: valores {valores.shape}, "
+                f"{len(datas)} datas, {len(tickers)} tickers."
+            )
+        self.valores = valores
+        self.datas = pd.DatetimeIndex(datas)
+        self.tickers = pd.Index(tickers, dtype=object)
+
+    # --- CONSTRUÇÃO ---
+    @classmethod
+    def from_frame(cls, df, dtype=np.float32):
+        # Uma única conversão para o layout compacto (coluna contígua)
+        valores = np.asfortranarray(df.to_numpy(dtype=dtype, copy=False))
+        return cls(valores, df.index, [str(c) for c in df.columns])
+
+    # --- PERSISTÊNCIA (MEMMAP) ---
+    @staticmethod
+    def _caminhos(caminho):
+        base = caminho[:-4] if caminho.endswith('.npy') else caminho
+        return base + '.npy', base + '.idx.npz'
+
+    def salvar(self, caminho):
+        arq_valores, arq_indices = self._caminhos(caminho)
+        os.makedirs(os.path.dirname(os.path.abspath(arq_valores)), exist_ok=True)
+        # Grava em nomes temporários no mesmo diretório e troca com os.replace
+        # (.idx.npz por último): quem lê nunca vê um .npy pela metade
+        tmp_valores = f"{arq_valores}.{os.getpid()}.tmp"
+        tmp_indices = f"{arq_indices}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_valores, 'wb') as f:
+                # np.save preserva a ordem Fortran no cabeçalho do .npy
+                np.save(f, np.asfortranarray(self.valores))
+            with open(tmp_indices, 'wb') as f:
+                np.savez(f,
+                         datas=self.datas.values.astype('datetime64[ns]'),
+                         tickers=np.array(self.tickers, dtype=str))
+            os.replace(tmp_valores, arq_valores)
+            os.replace(tmp_indices, arq_indices)
+        finally:
+            for tmp in (tmp_valores, tmp_indices):
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        return arq_valores
+
+    @classmethod
+    def carregar(cls, caminho, mmap_mode='r'):
+        arq_valores, arq_indices = cls._caminhos(caminho)
+        valores = np.load(arq_valores, mmap_mode=mmap_mode)
+        with np.load(arq_indices) as idx:
+            datas = idx['datas']
+            tickers = idx['tickers'].tolist()
+        return cls(valores, datas, tickers)
+
+    # --- PROPRIEDADES ---
+    @property
+    def shape(self):
+        return self.valores.shape
+
+    @property
+    def dtype(self):
+        return self.valores.dtype
+
+    @property
+    def nbytes(self):
+        return self.valores.nbytes
+
+    def __len__(self):
+        return len(self.datas)
+
+    def __contains__(self, ticker):
+        return ticker in self.tickers
+
+    def __repr__(self):
+        return (f"PainelPrecos({len(self.datas)} datas x {len(self.tickers)} tickers, "
+                f"{self.dtype}, {self.nbytes / 1e6:.1f} MB)")
+
+    # --- RECORTES ---
+    def _posicoes(self, tickers):
+        pos = self.tickers.get_indexer(list(tickers))
+        faltando = [t for t, p in zip(tickers, pos) if p < 0]
+        if faltando:
+            raise KeyError(f"Tickers fora do painel: {faltando}")
+        return pos
+
+    @staticmethod
+    def _como_slice(pos):
+        # Posições em progressão aritmética viram slice (view); o resto é fancy indexing
+        if len(pos) == 0:
+            return slice(0, 0)
+        if len(pos) == 1:
+            return slice(int(pos[0]), int(pos[0]) + 1)
+        passo = int(pos[1] - pos[0])
+        if passo > 0 and np.all(np.diff(pos) == passo):
+            return slice(int(pos[0]), int(pos[-1]) + 1, passo)
+        return pos
+
+    def selecionar(self, tickers=None, inicio=None, fim=None):
+        linhas = slice(None)
+        if inicio is not None or fim is not None:
+            linhas = self.datas.slice_indexer(inicio, fim)
+
+        if tickers is None:
+            colunas = slice(None)
+        else:
+            colunas = self._como_slice(self._posicoes(tickers))
+
+        return PainelPrecos(self.valores[linhas, colunas],
+                            self.datas[linhas],
+                            self.tickers[colunas])
+
+    def coluna(self, ticker):
+        # View 1D contígua (layout Fortran)
+        return self.valores[:, self._posicoes([ticker])[0]]
+
+    # --- LIMPEZA (equivalente ao dropna do pipeline original) ---
+    def sem_lacunas(self, remover_tickers_vazios=True):
+        # 1) remove tickers sem nenhum dado (dropna(axis=1, how='all'), opcional);
+        # 2) remove datas com qualquer NaN (dropna()).
+        # Se nada precisar sair, devolve o próprio painel (sem cópia). Caso
+        # contrário faz uma única cópia, já em ordem Fortran.
+        validos = ~np.isnan(self.valores)
+        if remover_tickers_vazios:
+            colunas = np.flatnonzero(validos.any(axis=0))
+        else:
+            colunas = np.arange(len(self.tickers))
+        lin_ok = validos[:, colunas].all(axis=1)
+        del validos
+
+        if lin_ok.all():
+            if len(colunas) == len(self.tickers):
+                return self
+            return self.selecionar(self.tickers[colunas])
+
+        # Indexação booleana nas linhas geraria uma cópia em ordem C; copia coluna a
+        # coluna para dentro de um bloco Fortran já alocado.
+        valores = np.empty((int(lin_ok.sum()), len(colunas)), dtype=self.dtype, order='F')
+        for j, c in enumerate(colunas):
+            np.compress(lin_ok, self.valores[:, c], out=valores[:, j])
+        return PainelPrecos(valores, self.datas[lin_ok], self.tickers[colunas])
+
+    # --- CONVERSÃO ---
+    def to_frame(self, dtype=None):
+        valores = self.valores
+        if dtype is not None and valores.dtype != np.dtype(dtype):
+            valores = valores.astype(dtype)
+        # copy=False: o DataFrame aponta para o mesmo buffer (inclusive o memmap)
+        return pd.DataFrame(valores, index=self.datas, columns=self.tickers, copy=False)
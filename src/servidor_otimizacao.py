@@ -0,0 +1,398 @@
+# --- 1. BIBLIOTECAS ---
+import asyncio
+import argparse
+import json
+import os
+import time
+import cvxpy as cp
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pypfopt import risk_models, expected_returns
+from painel_precos import PainelPrecos
+
+# ==============================================================================
+# SERVIDOR DE OTIMIZAÇÃO (MODO INTERATIVO)
+# Mantém mu e S em memória por universo e responde
+# POST /otimizar {"universo": "assets", "min": 0.05, "max": 0.30}
+# com os pesos + portfolio_performance da carteira Max Sharpe restrita.
+# Rajadas de requisições (arrastar os sliders) são agrupadas em lotes:
+# pedidos iguais dentro da janela viram um único solve, e o resultado fica
+# num cache LRU para as próximas consultas. O problema Max Sharpe é montado
+# uma vez por universo com MIN/MAX como cp.Parameter; cada pedido só troca
+# os parâmetros e re-resolve (warm start, sem recanonicalizar).
+# Se o 'markowitz_optimizer.py' regravar o painel, o universo é recarregado
+# (assim que os arquivos param de mudar) e o cache dele é descartado; se a
+# recarga falhar, a versão anterior continua sendo servida.
+# ==============================================================================
+HOST = '127.0.0.1'
+PORTA = 8765
+RISK_FREE = 0.045
+JANELA_LOTE_MS = 5      # Tempo de espera para juntar requisições no mesmo lote
+TAMANHO_CACHE = 512     # Resultados recentes guardados (LRU)
+CASAS_DECIMAIS = 4      # Granularidade dos sliders (0.0001 = 0,01%)
+CORTE_PESOS = 1e-4      # Mesmo corte/arredondamento do clean_weights() do pypfopt
+ESPERA_RECARGA_S = 1.0  # Painel alterado só é recarregado após ficar estável esse tempo
+# ==============================================================================
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not os.path.exists(os.path.join(base_dir, 'data')): base_dir = os.getcwd()
+processed_dir = os.path.join(base_dir, 'data', 'processed')
+
+
+# --- 2. UNIVERSOS (MU + SIGMA EM MEMÓRIA) ---
+class Universo:
+    def __init__(self, nome):
+        self.nome = nome
+        self.versao = self.versao_em_disco(nome)
+        # Lido sem memmap e descartado após mu/S: o servidor não segura o arquivo
+        # aberto (no Windows isso impediria o otimizador de regravá-lo)
+        painel = PainelPrecos.carregar(self.arquivo(nome), mmap_mode=None)
+        self.descricao = repr(painel)
+        precos = painel.to_frame()
+        self.mu = expected_returns.mean_historical_return(precos, frequency=252)
+        self.S = risk_models.CovarianceShrinkage(precos).ledoit_wolf()
+        del painel, precos
+        self._montar_problema()
+
+    @staticmethod
+    def arquivo(nome):
+        return os.path.join(processed_dir, f'painel_{nome}.npy')
+
+    @classmethod
+    def versao_em_disco(cls, nome):
+        # mtime do .npy e do .idx.npz (gravado por último pelo PainelPrecos.salvar)
+        arq_valores = cls.arquivo(nome)
+        arq_indices = arq_valores[:-4] + '.idx.npz'
+        try:
+            return (os.stat(arq_valores).st_mtime_ns, os.stat(arq_indices).st_mtime_ns)
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"Painel '{arq_valores}' não encontrado. Rode o 'markowitz_optimizer.py' primeiro."
+            ) from None
+
+    def _montar_problema(self):
+        # Mesma transformação do EfficientFrontier.max_sharpe (w = k * pesos):
+        #   min w'Sw  s.a.  (mu - rf)'w = 1,  sum(w) = k,  k*MIN <= w <= k*MAX
+        mu = self.mu.to_numpy()
+        if mu.max() <= RISK_FREE:
+            raise ValueError("Nenhum ativo tem retorno esperado acima da taxa livre de risco.")
+        n = len(mu)
+        self._w = cp.Variable(n)
+        self._k = cp.Variable()
+        self._minimo = cp.Parameter(nonneg=True)
+        self._maximo = cp.Parameter(nonneg=True)
+        self._problema = cp.Problem(
+            cp.Minimize(cp.quad_form(self._w, cp.psd_wrap(self.S.to_numpy()))),
+            [
+                (mu - RISK_FREE) @ self._w == 1,
+                cp.sum(self._w) == self._k,
+                self._k >= 0,
+                self._w >= self._minimo * self._k,
+                self._w <= self._maximo * self._k,
+            ],
+        )
+
+    def otimizar(self, minimo, maximo):
+        n = len(self.mu)
+        if minimo * n > 1 or maximo * n < 1 or minimo > maximo:
+            raise ValueError(
+                f"Restrições inviáveis para {n} ativos (Min {minimo:.2%} | Max {maximo:.2%}). "
+                "Verifique se Min * N_Ativos <= 100% <= Max * N_Ativos."
+            )
+        self._minimo.value = minimo
+        self._maximo.value = maximo
+        self._problema.solve(warm_start=True)
+        if self._problema.status not in ('optimal', 'optimal_inaccurate'):
+            raise ValueError(f"Otimização não convergiu ({self._problema.status}).")
+
+        w = self._w.value / self._k.value
+        ret = float(w @ self.mu.to_numpy())
+        vol = float(np.sqrt(w @ self.S.to_numpy() @ w))
+        sha = (ret - RISK_FREE) / vol
+        pesos = np.where(np.abs(w) < CORTE_PESOS, 0, w).round(5)
+        return {
+            'universo': self.nome,
+            'min': minimo,
+            'max': maximo,
+            'n_ativos': n,
+            'pesos': {t: float(v) for t, v in zip(self.mu.index, pesos) if v > 0},
+            'retorno': float(ret),
+            'volatilidade': float(vol),
+            'sharpe': float(sha),
+        }
+
+
+# --- 3. OTIMIZADOR COM LOTES + CACHE ---
+class ServicoOtimizacao:
+    def __init__(self, janela_ms=JANELA_LOTE_MS, tamanho_cache=TAMANHO_CACHE):
+        self.janela = janela_ms / 1000
+        self.tamanho_cache = tamanho_cache
+        self.universos = {}
+        self.cache = OrderedDict()
+        self.fila = asyncio.Queue()
+        # Um único worker de solve: o lote inteiro roda numa chamada ao executor,
+        # reaproveitando o problema parametrizado de cada universo
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.estatisticas = {'requisicoes': 0, 'acertos_cache': 0, 'lotes': 0, 'solves': 0}
+        self._tarefa = None
+        self._trava_universos = asyncio.Lock()
+        # nome -> [versão vista em disco, desde quando, recarga já falhou]
+        self._versoes_novas = {}
+
+    def iniciar(self):
+        self._tarefa = asyncio.get_running_loop().create_task(self._processar_lotes())
+
+    async def parar(self):
+        if self._tarefa:
+            self._tarefa.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def carregar_universo(self, nome):
+        async with self._trava_universos:
+            atual = self.universos.get(nome)
+            if atual is None:
+                return await self._carregar(nome)
+            if self._deve_recarregar(nome, atual):
+                try:
+                    return await self._carregar(nome)
+                except Exception as e:
+                    # Painel novo ilegível: segue servindo a versão já carregada e
+                    # só tenta de novo quando o arquivo mudar outra vez
+                    self._versoes_novas[nome][2] = True
+                    print(f" [AVISO] Falha ao recarregar '{nome}', mantendo a versão anterior: {e!r}")
+            return atual
+
+    def _deve_recarregar(self, nome, atual):
+        try:
+            versao = Universo.versao_em_disco(nome)
+        except FileNotFoundError:
+            return False
+        if versao == atual.versao:
+            self._versoes_novas.pop(nome, None)
+            return False
+        agora = time.monotonic()
+        vista = self._versoes_novas.get(nome)
+        if vista is None or vista[0] != versao:
+            # mtimes ainda mudando (otimizador gravando): espera estabilizar
+            self._versoes_novas[nome] = [versao, agora, False]
+            return False
+        return not vista[2] and agora - vista[1] >= ESPERA_RECARGA_S
+
+    async def _carregar(self, nome):
+        atual = self.universos.get(nome)
+        loop = asyncio.get_running_loop()
+        universo = await loop.run_in_executor(self.executor, Universo, nome)
+        self.universos[nome] = universo
+        self._versoes_novas.pop(nome, None)
+        self.cache = OrderedDict((c, r) for c, r in self.cache.items() if c[0] != nome)
+        acao = 'carregado' if atual is None else 'recarregado (painel alterado)'
+        print(f" > Universo '{nome}' {acao}: {universo.descricao}")
+        return universo
+
+    async def otimizar(self, nome, minimo, maximo):
+        self.estatisticas['requisicoes'] += 1
+        universo = await self.carregar_universo(nome)
+        # A versão do painel entra na chave: resultados de um painel antigo nunca são servidos
+        chave = (nome, universo.versao, round(minimo, CASAS_DECIMAIS), round(maximo, CASAS_DECIMAIS))
+        if chave in self.cache:
+            self.cache.move_to_end(chave)
+            self.estatisticas['acertos_cache'] += 1
+            return self.cache[chave]
+
+        futuro = asyncio.get_running_loop().create_future()
+        await self.fila.put((chave, universo, futuro))
+        return await futuro
+
+    async def _processar_lotes(self):
+        while True:
+            pendentes = [await self.fila.get()]
+            # Junta tudo o que chegar dentro da janela
+            await asyncio.sleep(self.janela)
+            while not self.fila.empty():
+                pendentes.append(self.fila.get_nowait())
+
+            # Uma falha fora do solve (executor encerrado, erro ao responder...) não
+            # pode matar o worker: os pedidos do lote recebem o erro e o loop segue
+            try:
+                await self._executar_lote(pendentes)
+            except Exception as e:
+                print(f" [ERRO] Falha no lote: {e!r}")
+                for _, _, futuro in pendentes:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+
+    async def _executar_lote(self, pendentes):
+        lote, universos = {}, {}
+        for chave, universo, futuro in pendentes:
+            lote.setdefault(chave, []).append(futuro)
+            universos[chave] = universo
+
+        # Pedidos já resolvidos por um lote anterior saem direto do cache
+        # (lidos agora: o _guardar abaixo pode despejá-los do LRU)
+        resultados = {c: self.cache[c] for c in lote if c in self.cache}
+        a_resolver = [(c, universos[c]) for c in lote if c not in resultados]
+        self.estatisticas['lotes'] += 1
+        self.estatisticas['solves'] += len(a_resolver)
+        loop = asyncio.get_running_loop()
+        resultados.update(await loop.run_in_executor(self.executor, self._resolver_lote, a_resolver))
+
+        for chave, futuros in lote.items():
+            resultado = resultados[chave]
+            for futuro in futuros:
+                if futuro.done():
+                    continue
+                if isinstance(resultado, Exception):
+                    futuro.set_exception(resultado)
+                else:
+                    futuro.set_result(resultado)
+        for chave, resultado in resultados.items():
+            if not isinstance(resultado, Exception):
+                self._guardar(chave, resultado)
+
+    def _resolver_lote(self, pedidos):
+        resultados = {}
+        for chave, universo in pedidos:
+            _, _, minimo, maximo = chave
+            try:
+                resultados[chave] = universo.otimizar(minimo, maximo)
+            except Exception as e:
+                resultados[chave] = e
+        return resultados
+
+    def _guardar(self, chave, resultado):
+        self.cache[chave] = resultado
+        self.cache.move_to_end(chave)
+        while len(self.cache) > self.tamanho_cache:
+            self.cache.popitem(last=False)
+
+
+# --- 4. HTTP MÍNIMO (ASYNCIO, KEEP-ALIVE) ---
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 422: 'Unprocessable Entity'}
+
+
+def resposta_http(status, corpo):
+    dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+    cabecalho = (
+        f"HTTP/1.1 {status} {STATUS.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(dados)}\r\n"
+        "\r\n"
+    )
+    return cabecalho.encode('latin-1') + dados
+
+
+async def tratar_requisicao(servico, metodo, rota, corpo):
+    if metodo == 'GET' and rota == '/saude':
+        return 200, {
+            'universos': list(servico.universos),
+            'cache': len(servico.cache),
+            **servico.estatisticas,
+        }
+
+    if metodo == 'POST' and rota == '/otimizar':
+        try:
+            pedido = json.loads(corpo or b'{}')
+            if not isinstance(pedido, dict):
+                raise TypeError("o corpo deve ser um objeto JSON")
+            nome = str(pedido.get('universo', 'assets'))
+            minimo = float(pedido['min'])
+            maximo = float(pedido['max'])
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'erro': f"Pedido inválido: {e}"}
+        if not nome.replace('_', '').replace('-', '').isalnum():
+            return 400, {'erro': f"Nome de universo inválido: {nome}"}
+        try:
+            return 200, await servico.otimizar(nome, minimo, maximo)
+        except FileNotFoundError as e:
+            return 404, {'erro': str(e)}
+        except Exception as e:
+            return 422, {'erro': str(e)}
+
+    return 404, {'erro': f"Rota não encontrada: {metodo} {rota}"}
+
+
+async def atender_conexao(servico, reader, writer):
+    try:
+        while True:
+            linha = await reader.readline()
+            if not linha:
+                break
+            try:
+                metodo, rota, _ = linha.decode('latin-1').split(' ', 2)
+            except ValueError:
+                writer.write(resposta_http(400, {'erro': 'Linha de requisição inválida'}))
+                await writer.drain()
+                break
+
+            cabecalhos = {}
+            while True:
+                h = await reader.readline()
+                if h in (b'\r\n', b'\n', b''):
+                    break
+                k, _, v = h.decode('latin-1').partition(':')
+                cabecalhos[k.strip().lower()] = v.strip()
+
+            try:
+                tamanho = int(cabecalhos.get('content-length', 0))
+                if tamanho < 0: raise ValueError
+            except ValueError:
+                writer.write(resposta_http(400, {'erro': 'Content-Length inválido'}))
+                await writer.drain()
+                break
+            corpo = await reader.readexactly(tamanho) if tamanho else b''
+
+            status, resposta = await tratar_requisicao(servico, metodo, rota, corpo)
+            writer.write(resposta_http(status, resposta))
+            await writer.drain()
+
+            if cabecalhos.get('connection', '').lower() == 'close':
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    except ValueError:
+        # readline() acima do limite do StreamReader (linha/cabeçalho > 64 KiB)
+        try:
+            writer.write(resposta_http(400, {'erro': 'Linha de requisição ou cabeçalho grande demais'}))
+            await writer.drain()
+        except ConnectionError:
+            pass
+    finally:
+        writer.close()
+
+
+# --- 5. EXECUÇÃO ---
+async def main(args):
+    servico = ServicoOtimizacao(janela_ms=args.janela_ms)
+    servico.iniciar()
+
+    for nome in args.universos:
+        await servico.carregar_universo(nome)
+
+    conexao = lambda r, w: atender_conexao(servico, r, w)
+    if args.unix:
+        servidor = await asyncio.start_unix_server(conexao, path=args.unix)
+        print(f"--- Servidor de Otimização em unix:{args.unix} ---")
+    else:
+        servidor = await asyncio.start_server(conexao, args.host, args.porta)
+        print(f"--- Servidor de Otimização em http://{args.host}:{args.porta} ---")
+
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servico.parar()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Servidor local de otimização Markowitz.")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--porta', type=int, default=PORTA)
+    parser.add_argument('--unix', help="Caminho de socket Unix (substitui host/porta)")
+    parser.add_argument('--janela-ms', type=float, default=JANELA_LOTE_MS)
+    parser.add_argument('--universos', nargs='*', default=['assets'],
+                        help="Universos pré-carregados (data/processed/painel_<nome>.npy)")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.painel_precos import PainelPrecos
+
+
+@pytest.fixture
+def df_precos():
+    rng = np.random.default_rng(0)
+    datas = pd.bdate_range('2020-01-01', periods=60)
+    df = pd.DataFrame(100 + rng.random((60, 6)), index=datas, columns=list('ABCDEF'))
+    df.iloc[3, 2] = np.nan   # data incompleta
+    df.iloc[10, 0] = np.nan  # outra data incompleta
+    df['F'] = np.nan         # ticker sem dados
+    return df
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_salvar_carregar_preserva_layout(tmp_path, df_precos, dtype):
+    painel = PainelPrecos.from_frame(df_precos, dtype=dtype)
+    arq = painel.salvar(str(tmp_path / 'painel_teste'))
+    assert arq.endswith('.npy')
+
+    carregado = PainelPrecos.carregar(arq)
+    assert carregado.dtype == np.dtype(dtype)
+    assert carregado.valores.flags.f_contiguous
+    assert isinstance(carregado.datas, pd.DatetimeIndex)
+    assert carregado.datas.equals(df_precos.index)
+    assert list(carregado.tickers) == list(df_precos.columns)
+    assert all(isinstance(t, str) for t in carregado.tickers)
+    np.testing.assert_array_equal(carregado.valores, df_precos.to_numpy(dtype=dtype))
+
+
+def test_carregar_usa_memmap(tmp_path, df_precos):
+    arq = PainelPrecos.from_frame(df_precos).salvar(str(tmp_path / 'painel_teste'))
+    carregado = PainelPrecos.carregar(arq)
+    assert isinstance(carregado.valores.base, np.memmap) or isinstance(carregado.valores, np.memmap)
+
+
+@pytest.mark.parametrize('pos, esperado', [
+    ([2], slice(2, 3)),
+    ([1, 2, 3], slice(1, 4, 1)),
+    ([0, 2, 4], slice(0, 5, 2)),
+    ([], slice(0, 0)),
+])
+def test_como_slice_progressao(pos, esperado):
+    assert PainelPrecos._como_slice(np.array(pos, dtype=int)) == esperado
+
+
+@pytest.mark.parametrize('pos', [[0, 1, 3], [3, 1], [2, 2]])
+def test_como_slice_fora_de_progressao(pos):
+    assert not isinstance(PainelPrecos._como_slice(np.array(pos)), slice)
+
+
+def test_selecionar_view_e_copia(df_precos):
+    painel = PainelPrecos.from_frame(df_precos)
+
+    faixa = painel.selecionar(['B', 'C', 'D'], inicio='2020-02-01')
+    assert np.shares_memory(faixa.valores, painel.valores)
+    assert faixa.datas[0] >= pd.Timestamp('2020-02-01')
+    assert list(faixa.tickers) == ['B', 'C', 'D']
+
+    assert np.shares_memory(painel.selecionar(['A', 'C', 'E']).valores, painel.valores)
+    assert np.shares_memory(painel.coluna('B'), painel.valores)
+    assert painel.coluna('B').flags.c_contiguous
+
+    arbitrario = painel.selecionar(['A', 'B', 'D'])
+    assert not np.shares_memory(arbitrario.valores, painel.valores)
+    np.testing.assert_array_equal(arbitrario.valores, painel.valores[:, [0, 1, 3]])
+
+    with pytest.raises(KeyError):
+        painel.selecionar(['A', 'ZZZ'])
+
+
+def test_to_frame_sem_copia(df_precos):
+    painel = PainelPrecos.from_frame(df_precos)
+    frame = painel.to_frame()
+    assert np.shares_memory(frame.to_numpy(), painel.valores)
+    assert frame.index.equals(df_precos.index)
+
+
+def test_sem_lacunas_igual_dropna(df_precos):
+    painel = PainelPrecos.from_frame(df_precos, dtype=np.float64)
+
+    limpo = painel.sem_lacunas()
+    esperado = df_precos.dropna(axis=1, how='all').dropna()
+    pd.testing.assert_frame_equal(limpo.to_frame(), esperado, check_freq=False, check_column_type=False)
+    assert limpo.valores.flags.f_contiguous
+
+    so_linhas = painel.sem_lacunas(remover_tickers_vazios=False)
+    assert so_linhas.shape == df_precos.dropna().shape
+
+
+def test_sem_lacunas_sem_nan_devolve_o_mesmo(df_precos):
+    painel = PainelPrecos.from_frame(df_precos.dropna(axis=1, how='all').dropna())
+    assert painel.sem_lacunas() is painel
+
+
+def test_salvar_atomico_mantem_arquivos_anteriores(tmp_path, df_precos, monkeypatch):
+    arq = PainelPrecos.from_frame(df_precos).salvar(str(tmp_path / 'painel_teste'))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['painel_teste.idx.npz', 'painel_teste.npy']
+
+    def falha(*args, **kwargs):
+        raise OSError("disco cheio")
+    monkeypatch.setattr(np, 'savez', falha)
+    with pytest.raises(OSError):
+        PainelPrecos.from_frame(df_precos.iloc[:10]).salvar(arq)
+
+    # Nada foi trocado e nenhum temporário ficou para trás
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['painel_teste.idx.npz', 'painel_teste.npy']
+    assert PainelPrecos.carregar(arq).shape == df_precos.shape
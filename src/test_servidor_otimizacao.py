@@ -0,0 +1,141 @@
+import asyncio
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import servidor_otimizacao as so
+
+
+def gravar_painel(diretorio, semente=0, nome='teste'):
+    rng = np.random.default_rng(semente)
+    datas = pd.bdate_range('2020-01-01', periods=500)
+    retornos = rng.normal(0.0006, 0.02, (500, 8))
+    df = pd.DataFrame(100 * np.exp(np.cumsum(retornos, axis=0)), index=datas,
+                      columns=[f'T{i}' for i in range(8)])
+    arq = so.PainelPrecos.from_frame(df).salvar(os.path.join(diretorio, f'painel_{nome}'))
+    # Garante mtime diferente mesmo em sistemas de arquivos com baixa resolução
+    for caminho in (arq, arq[:-4] + '.idx.npz'):
+        os.utime(caminho, ns=(semente * 10**9 + 10**18, semente * 10**9 + 10**18))
+    return arq
+
+
+@pytest.fixture
+def diretorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(so, 'processed_dir', str(tmp_path))
+    monkeypatch.setattr(so, 'ESPERA_RECARGA_S', 0)
+    gravar_painel(str(tmp_path))
+    return tmp_path
+
+
+def rodar(teste, **kwargs):
+    async def principal():
+        servico = so.ServicoOtimizacao(**kwargs)
+        servico.iniciar()
+        try:
+            return await teste(servico)
+        finally:
+            await servico.parar()
+    return asyncio.run(principal())
+
+
+def test_chaves_iguais_no_lote_viram_um_solve(diretorio):
+    async def teste(servico):
+        await servico.carregar_universo('teste')
+        resultados = await asyncio.gather(*[servico.otimizar('teste', 0.05, 0.30) for _ in range(5)])
+        assert servico.estatisticas['solves'] == 1
+        assert servico.estatisticas['lotes'] == 1
+        assert all(r is resultados[0] for r in resultados)
+        assert sum(resultados[0]['pesos'].values()) == pytest.approx(1, abs=1e-3)
+    rodar(teste)
+
+
+def test_acerto_de_cache_nao_enfileira_solve(diretorio):
+    async def teste(servico):
+        primeiro = await servico.otimizar('teste', 0.05, 0.30)
+        segundo = await servico.otimizar('teste', 0.05, 0.30)
+        assert segundo is primeiro
+        assert servico.estatisticas['solves'] == 1
+        assert servico.estatisticas['acertos_cache'] == 1
+        assert servico.fila.empty()
+    rodar(teste)
+
+
+def test_cache_minimo_nunca_devolve_none(diretorio):
+    async def teste(servico):
+        universo = await servico.carregar_universo('teste')
+        await servico.otimizar('teste', 0.05, 0.30)
+        chave_em_cache = next(iter(servico.cache))
+
+        # Lote com várias chaves novas e, por último, uma já em cache: o _guardar
+        # das novas despeja a antiga do LRU (tamanho_cache=1) antes de ela ser lida
+        loop = asyncio.get_running_loop()
+        futuros = []
+        for chave in [('teste', universo.versao, 0.01 * i, 0.5) for i in range(1, 6)] + [chave_em_cache]:
+            futuro = loop.create_future()
+            futuros.append(futuro)
+            await servico.fila.put((chave, universo, futuro))
+
+        resultados = await asyncio.gather(*futuros)
+        assert all(isinstance(r, dict) for r in resultados)
+        assert len(servico.cache) == 1
+    rodar(teste, tamanho_cache=1)
+
+
+def test_painel_alterado_recarrega_e_invalida_cache(diretorio):
+    async def teste(servico):
+        antigo = await servico.otimizar('teste', 0.05, 0.30)
+        universo_antigo = servico.universos['teste']
+
+        gravar_painel(str(diretorio), semente=1)
+        await servico.carregar_universo('teste')  # 1ª vez vê a versão nova (ainda estabilizando)
+        novo = await servico.otimizar('teste', 0.05, 0.30)
+
+        assert servico.universos['teste'] is not universo_antigo
+        assert novo['sharpe'] != antigo['sharpe']
+        assert all(c[1] == servico.universos['teste'].versao for c in servico.cache)
+        assert servico.estatisticas['solves'] == 2
+    rodar(teste)
+
+
+def test_recarga_com_falha_mantem_versao_anterior(diretorio):
+    async def teste(servico):
+        antigo = await servico.otimizar('teste', 0.05, 0.30)
+
+        arq = os.path.join(str(diretorio), 'painel_teste.npy')
+        with open(arq, 'rb') as f:
+            dados = f.read()
+        with open(arq, 'wb') as f:
+            f.write(dados[:len(dados) // 2])
+
+        for _ in range(3):
+            assert await servico.otimizar('teste', 0.05, 0.30) is antigo
+    rodar(teste)
+
+
+def test_restricoes_inviaveis(diretorio):
+    universo = so.Universo('teste')
+    with pytest.raises(ValueError):
+        universo.otimizar(0.5, 0.6)   # 8 ativos x 50% > 100%
+    with pytest.raises(ValueError):
+        universo.otimizar(0.0, 0.1)   # 8 ativos x 10% < 100%
+
+    async def teste(servico):
+        with pytest.raises(ValueError):
+            await servico.otimizar('teste', 0.3, 0.2)
+    rodar(teste)
+
+
+@pytest.mark.parametrize('corpo, status', [
+    (b'[1]', 400),
+    (b'{"min": "a", "max": 0.3}', 400),
+    (b'{"universo": "../x", "min": 0, "max": 1}', 400),
+    (b'{"universo": "outro", "min": 0, "max": 1}', 404),
+])
+def test_tratar_requisicao_pedidos_invalidos(diretorio, corpo, status):
+    async def teste(servico):
+        recebido, resposta = await so.tratar_requisicao(servico, 'POST', '/otimizar', corpo)
+        assert recebido == status
+        assert 'erro' in resposta
+    rodar(teste)